@@ -1,22 +1,41 @@
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from uuid import uuid4
-from datetime import datetime, date
-import json, os
+from datetime import datetime, date, timezone
+import asyncio, os, time
+from collections import OrderedDict
+from functools import lru_cache
+from operator import itemgetter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import Optional
+from database import db
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
 
 
 DATA_DIR = "data"
+DB_FILE = os.path.join(DATA_DIR, "app.db")
+# pre-SQLite data files, imported into app.db once
 USERS_FILE = os.path.join(DATA_DIR, "users.json")
-SNAP_FILE = os.path.join(DATA_DIR, "snapshots.json")
+SNAP_FILE = os.path.join(DATA_DIR, "snapshots.jsonl")
+LEGACY_SNAP_FILE = os.path.join(DATA_DIR, "snapshots.json")
 os.makedirs(DATA_DIR, exist_ok=True)
-for f in (USERS_FILE, SNAP_FILE):
-    if not os.path.exists(f):
-        with open(f, "w", encoding="utf-8") as fh:
-            json.dump({}, fh)
+db.init_db(DB_FILE)
+db.import_json(USERS_FILE, SNAP_FILE, LEGACY_SNAP_FILE)
+
+# orjson is optional; without it responses fall back to the stdlib encoder.
+# Newer FastAPI releases deprecate ORJSONResponse (warning on every response) and
+# serialize natively instead, so only use it where it is still supported.
+if orjson is not None and not getattr(ORJSONResponse, "__deprecated__", None):
+    ResponseClass = ORJSONResponse
+else:
+    ResponseClass = JSONResponse
 
-app = FastAPI(title="Medical Clone — User Profile (baseline)")
+app = FastAPI(title="Medical Clone — User Profile (baseline)", default_response_class=ResponseClass)
 
 # --- CORS ---
 app.add_middleware(
@@ -28,30 +47,24 @@ app.add_middleware(
 )
 
 # --- helpers ---
-def read_json(path):
-    with open(path, "r", encoding="utf-8") as fh:
-        return json.load(fh)
-
-def write_json(path, data):
-    with open(path, "w", encoding="utf-8") as fh:
-        json.dump(data, fh, indent=2)
-
-def age_from_dob(dob_str):
-    dob = datetime.strptime(dob_str, "%Y-%m-%d").date()
-    today = date.today()
+_last_ts = (0, "")
+
+def _now_iso():
+    """UTC ISO timestamp at one-second resolution, formatted once per second."""
+    global _last_ts
+    sec = int(time.time())
+    if sec != _last_ts[0]:
+        _last_ts = (sec, datetime.fromtimestamp(sec, timezone.utc).replace(tzinfo=None).isoformat())
+    return _last_ts[1]
+
+@lru_cache(maxsize=4096)
+def _age(dob_str, today_ord):
+    dob = date.fromisoformat(dob_str)
+    today = date.fromordinal(today_ord)
     return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
 
-def calculate_bmi(weight_kg: float, height_cm: float):
-    h_m = height_cm / 100.0
-    if h_m <= 0: return None
-    return round(weight_kg / (h_m * h_m), 2)
-
-def calculate_bmr(weight_kg: float, height_cm: float, age: int, sex: str):
-    base = 10 * weight_kg + 6.25 * height_cm - 5 * age
-    if sex.lower() == "male":
-        return round(base + 5, 0)
-    else:
-        return round(base - 161, 0)
+def age_from_dob(dob_str):
+    return _age(dob_str, date.today().toordinal())
 
 ACTIVITY_FACTORS = {
     "sedentary": 1.2,
@@ -61,12 +74,40 @@ ACTIVITY_FACTORS = {
     "very_active": 1.9
 }
 
-def calculate_tdee(bmr: float, activity_level: str):
-    factor = ACTIVITY_FACTORS.get(activity_level, 1.2)
-    return round(bmr * factor, 0)
+# Mifflin-St Jeor sex constant; anything other than "male" uses the female offset
+SEX_OFFSETS = {"male": 5, "female": -161}
+
+def compute_metrics(weight_kg: float, height_cm: float, age: int, sex: str, activity_level: str):
+    """Return (bmi, bmr, tdee) for one snapshot."""
+    h_m = height_cm / 100.0
+    bmi = round(weight_kg / (h_m * h_m), 2) if h_m > 0 else None
+    bmr = round(10 * weight_kg + 6.25 * height_cm - 5 * age + SEX_OFFSETS.get(sex.lower(), -161), 0)
+    tdee = round(bmr * ACTIVITY_FACTORS.get(activity_level, 1.2), 0)
+    return bmi, bmr, tdee
+
+# LRU of profile rows by user_id; users are never updated, so a hit never
+# goes stale. Misses are not cached, so a user created later is still found.
+USER_CACHE_SIZE = 10_000
+_user_cache = OrderedDict()
+
+async def find_user(user_id):
+    """Return the user's profile row or raise 404; only cache misses touch SQLite."""
+    user = _user_cache.get(user_id)
+    if user is not None:
+        _user_cache.move_to_end(user_id)
+        return user
+    user = await asyncio.to_thread(db.fetch_user, user_id)
+    if user is None:
+        raise HTTPException(404, detail="User not found")
+    _user_cache[user_id] = user
+    if len(_user_cache) > USER_CACHE_SIZE:
+        _user_cache.popitem(last=False)
+    return user
 
 # --- models ---
 class UserCreate(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     name: str
     dob: str
     sex: str
@@ -75,9 +116,20 @@ class UserCreate(BaseModel):
     activity_level: str = Field("sedentary")
     user_id: str
 
+    @field_validator("dob")
+    @classmethod
+    def _iso_dob(cls, v):
+        # _age parses with date.fromisoformat, so reject anything it can't read
+        # up front and store the canonical YYYY-MM-DD form
+        return date.fromisoformat(v).isoformat()
+
 class UserOut(UserCreate):
     id: str
 
+# projects a stored user row onto the UserCreate fields in C
+_USER_FIELDS = tuple(UserCreate.model_fields)
+_user_getter = itemgetter(*_USER_FIELDS)
+
 class SnapshotCreate(BaseModel):
     weight_kg: float
     height_cm: float = None
@@ -104,47 +156,35 @@ class SnapshotOut(BaseModel):
 
 # --- ROUTES ---
 @app.get("/api/health")
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
 @app.post("/api/users", response_model=UserOut)
-def create_user(u: UserCreate):
-    users = read_json(USERS_FILE)
-    uid = u.user_id
-    if uid in users:
+async def create_user(u: UserCreate):
+    payload = u.model_dump()
+    if not await asyncio.to_thread(db.insert_user, {**payload, "created_at": _now_iso()}):
         raise HTTPException(400, detail="user_id already exists")
-    users[uid] = u.dict()
-    users[uid]["created_at"] = datetime.utcnow().isoformat()
-    write_json(USERS_FILE, users)
-    return {"id": uid, **u.dict()}
+    return {"id": u.user_id, **payload}
 
 @app.get("/api/users/{user_id}", response_model=UserOut)
-def get_user(user_id: str):
-    users = read_json(USERS_FILE)
-    if user_id not in users:
-        raise HTTPException(404, detail="User not found")
-    return {"id": user_id, **{k:v for k,v in users[user_id].items() if k in UserCreate.__fields__}}
+async def get_user(user_id: str):
+    user = await find_user(user_id)
+    return dict(zip(_USER_FIELDS, _user_getter(user)), id=user_id)
 
 @app.post("/api/users/{user_id}/snapshots", response_model=SnapshotOut)
-def create_snapshot(user_id: str, s: SnapshotCreate):
-    users = read_json(USERS_FILE)
-    if user_id not in users:
-        raise HTTPException(404, detail="User not found")
+async def create_snapshot(user_id: str, s: SnapshotCreate):
+    user = await find_user(user_id)
 
-    user = users[user_id]
-    height = s.height_cm or user.get("height_cm")
-    activity = s.activity_level or user.get("activity_level", "sedentary")
+    height = s.height_cm or user["height_cm"]
+    activity = s.activity_level or user["activity_level"]
     weight = s.weight_kg
     age = age_from_dob(user["dob"])
 
-    bmi = calculate_bmi(weight, height)
-    bmr = calculate_bmr(weight, height, age, user["sex"])
-    tdee = calculate_tdee(bmr, activity)
-    ts = s.timestamp or datetime.utcnow().isoformat()
+    bmi, bmr, tdee = compute_metrics(weight, height, age, user["sex"], activity)
+    ts = s.timestamp or _now_iso()
 
-    snaps = read_json(SNAP_FILE)
     sid = str(uuid4())
-    snaps[sid] = {
+    snap = {
         "user_id": user_id,
         "timestamp": ts,
         "weight_kg": weight,
@@ -157,21 +197,16 @@ def create_snapshot(user_id: str, s: SnapshotCreate):
         "bmr": bmr,
         "tdee": tdee
     }
-    write_json(SNAP_FILE, snaps)
+    await asyncio.to_thread(db.insert_snapshot, sid, snap)
 
-    return {"id": sid, "user_id": user_id, "timestamp": ts, **snaps[sid]}
+    return {"id": sid, **snap}
 
-@app.get("/api/users/{user_id}/snapshots", response_model=list[SnapshotOut])
-def list_snapshots(user_id: str):
-    users = read_json(USERS_FILE)
-    if user_id not in users:
-        raise HTTPException(404, detail="User not found")
+# rows come straight from SQLite in SnapshotOut shape, so skip
+# response_model validation and hand them to the encoder directly;
+# `responses` keeps the schema in the OpenAPI docs
+@app.get("/api/users/{user_id}/snapshots", responses={200: {"model": list[SnapshotOut]}})
+async def list_snapshots(user_id: str):
+    await find_user(user_id)
 
-    snaps = read_json(SNAP_FILE)
-    user_snaps = [
-        {"id": sid, **snap}
-        for sid, snap in snaps.items()
-        if snap["user_id"] == user_id
-    ]
-    user_snaps.sort(key=lambda x: x["timestamp"])
-    return user_snaps
+    rows = await asyncio.to_thread(db.fetch_snapshots, user_id)
+    return ResponseClass([dict(row) for row in rows])
@@ -0,0 +1,118 @@
+import json, os, sqlite3, threading
+from operator import itemgetter
+
+DB_PATH = None
+_local = threading.local()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    dob TEXT NOT NULL,
+    sex TEXT NOT NULL,
+    height_cm REAL NOT NULL,
+    weight_kg REAL NOT NULL,
+    activity_level TEXT NOT NULL,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    sid TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL REFERENCES users(user_id),
+    timestamp TEXT NOT NULL,
+    weight_kg REAL NOT NULL,
+    height_cm REAL,
+    activity_level TEXT,
+    sleep_hours REAL,
+    calories_intake REAL,
+    notes TEXT,
+    bmi REAL,
+    bmr REAL,
+    tdee REAL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_user_ts ON snapshots(user_id, timestamp);
+"""
+
+USER_COLUMNS = ("user_id", "name", "dob", "sex", "height_cm", "weight_kg", "activity_level", "created_at")
+SNAPSHOT_COLUMNS = ("user_id", "timestamp", "weight_kg", "height_cm", "activity_level", "sleep_hours",
+                    "calories_intake", "notes", "bmi", "bmr", "tdee")
+
+_snapshot_values = itemgetter(*SNAPSHOT_COLUMNS)
+
+_INSERT_USER = "INSERT OR IGNORE INTO users ({}) VALUES ({})".format(
+    ", ".join(USER_COLUMNS), ", ".join("?" * len(USER_COLUMNS)))
+_INSERT_SNAPSHOT = "INSERT INTO snapshots (sid, {}) VALUES (?, {})".format(
+    ", ".join(SNAPSHOT_COLUMNS), ", ".join("?" * len(SNAPSHOT_COLUMNS)))
+_SELECT_USER = "SELECT {} FROM users WHERE user_id = ?".format(", ".join(USER_COLUMNS[:-1]))
+# rowid breaks timestamp ties in insertion order
+_SELECT_SNAPSHOTS = "SELECT sid AS id, {} FROM snapshots WHERE user_id = ? ORDER BY timestamp, rowid".format(
+    ", ".join(SNAPSHOT_COLUMNS))
+
+
+def init_db(path):
+    """Point the module at the database file and make sure the schema exists."""
+    global DB_PATH
+    DB_PATH = path
+    conn = connect()
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+
+def connect():
+    """Return this thread's connection, opening it on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn, _local.path = conn, DB_PATH
+    return conn
+
+def insert_user(user):
+    """Insert a user record; returns False if the user_id is already taken."""
+    cur = connect().execute(_INSERT_USER, [user.get(c) for c in USER_COLUMNS])
+    return cur.rowcount == 1
+
+def fetch_user(user_id):
+    """Return the user's profile row (without created_at), or None."""
+    return connect().execute(_SELECT_USER, (user_id,)).fetchone()
+
+def insert_snapshot(sid, snap):
+    connect().execute(_INSERT_SNAPSHOT, (sid, *_snapshot_values(snap)))
+
+def fetch_snapshots(user_id):
+    """Return the user's snapshot rows ordered by timestamp."""
+    return connect().execute(_SELECT_SNAPSHOTS, (user_id,)).fetchall()
+
+def import_json(users_path, snaps_path, legacy_snaps_path=None):
+    """Import the pre-SQLite data files once.
+
+    Reads users.json plus snapshots.jsonl, or the older snapshots.json dict
+    when no .jsonl log exists. Completion is recorded as PRAGMA user_version
+    inside the same transaction, so a failed import is retried on the next
+    start instead of being skipped.
+    """
+    conn = connect()
+    # IMMEDIATE takes the write lock up front so concurrent workers import once
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            conn.execute("COMMIT")
+            return
+        if os.path.exists(users_path):
+            with open(users_path, "rb") as fh:
+                users = json.loads(fh.read())
+            conn.executemany(_INSERT_USER, [[u.get(c) for c in USER_COLUMNS] for u in users.values()])
+        snaps = []
+        if os.path.exists(snaps_path):
+            with open(snaps_path, "rb") as fh:
+                snaps = [json.loads(line) for line in fh if line.strip()]
+        elif legacy_snaps_path and os.path.exists(legacy_snaps_path):
+            with open(legacy_snaps_path, "rb") as fh:
+                snaps = [{"id": sid, **snap} for sid, snap in json.loads(fh.read()).items()]
+        conn.executemany(
+            _INSERT_SNAPSHOT.replace("INSERT", "INSERT OR IGNORE", 1),
+            [[s["id"]] + [s.get(c) for c in SNAPSHOT_COLUMNS] for s in snaps])
+        conn.execute("PRAGMA user_version = 1")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
@@ -44,19 +44,24 @@ files = [
     "docs/user_manual.md"
 ]
 
-# Create folders
-for folder in folders:
-    os.makedirs(folder, exist_ok=True)
+if __name__ == "__main__":
+    # Create folders
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
 
-# Create files
-for file in files:
-    with open(file, "w", encoding="utf-8") as f:
-        # Add a small placeholder for README and .gitignore
-        if file == "README.md":
-            f.write("# Medical Clone\n\nAI-driven body effect simulator project.")
-        elif file == ".gitignore":
-            f.write("__pycache__/\n*.pyc\n*.pkl\n.env\n.DS_Store")
-        else:
-            pass  # leave other files empty
+    # Create files ("x" mode never truncates a file that already exists)
+    for file in files:
+        try:
+            f = open(file, "x", encoding="utf-8")
+        except FileExistsError:
+            continue
+        with f:
+            # Add a small placeholder for README and .gitignore
+            if file == "README.md":
+                f.write("# Medical Clone\n\nAI-driven body effect simulator project.")
+            elif file == ".gitignore":
+                f.write("__pycache__/\n*.pyc\n*.pkl\n.env\n.DS_Store")
+            else:
+                pass  # leave other files empty
 
-print("✅ Medical Clone project structure created successfully!")
+    print("✅ Medical Clone project structure created successfully!")
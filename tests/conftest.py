@@ -0,0 +1,4 @@
+import os, sys
+
+# the backend is run from backend/ (uvicorn app:app), so import it the same way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
@@ -0,0 +1,56 @@
+import importlib
+from collections import OrderedDict
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from database import db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # app.py creates data/app.db relative to the cwd on first import
+    monkeypatch.chdir(tmp_path)
+    app = importlib.import_module("app")
+    db.init_db(str(tmp_path / "app.db"))
+    monkeypatch.setattr(app, "_user_cache", OrderedDict())
+    return app
+
+@pytest.fixture
+def client(app):
+    return TestClient(app.app)
+
+def new_user(user_id, **overrides):
+    user = dict(name="Test", dob="1990-06-01", sex="female", height_cm=165, weight_kg=60, user_id=user_id)
+    user.update(overrides)
+    return user
+
+
+def test_missing_user_is_not_cached(client):
+    assert client.get("/api/users/u1").status_code == 404
+    assert client.post("/api/users", json=new_user("u1")).status_code == 200
+    assert client.get("/api/users/u1").status_code == 200
+
+def test_user_cache_evicts_least_recently_used(app, client, monkeypatch):
+    monkeypatch.setattr(app, "USER_CACHE_SIZE", 2)
+    for uid in ("u1", "u2", "u3"):
+        client.post("/api/users", json=new_user(uid))
+    client.get("/api/users/u1")
+    client.get("/api/users/u2")
+    client.get("/api/users/u1")
+    client.get("/api/users/u3")
+    assert list(app._user_cache) == ["u1", "u3"]
+
+@pytest.mark.parametrize("dob", ["1990-6-1", "01/06/1990", "not a date"])
+def test_invalid_dob_is_rejected_on_create(client, dob):
+    assert client.post("/api/users", json=new_user("u1", dob=dob)).status_code == 422
+    assert client.get("/api/users/u1").status_code == 404
+
+def test_dob_is_stored_as_yyyy_mm_dd(client):
+    assert client.post("/api/users", json=new_user("u1", dob="19900601")).status_code == 200
+    assert client.get("/api/users/u1").json()["dob"] == "1990-06-01"
+    assert client.post("/api/users/u1/snapshots", json={"weight_kg": 61}).status_code == 200
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from database import db
+
+
+def make_user(user_id="u1", **overrides):
+    user = {
+        "user_id": user_id,
+        "name": "Test",
+        "dob": "1990-06-01",
+        "sex": "female",
+        "height_cm": 165.0,
+        "weight_kg": 60.0,
+        "activity_level": "sedentary",
+        "created_at": "2025-01-01T00:00:00",
+    }
+    user.update(overrides)
+    return user
+
+def make_snapshot(user_id="u1", timestamp="2025-01-01T00:00:00", weight_kg=60.0):
+    return {
+        "user_id": user_id,
+        "timestamp": timestamp,
+        "weight_kg": weight_kg,
+        "height_cm": 165.0,
+        "activity_level": "sedentary",
+        "sleep_hours": None,
+        "calories_intake": None,
+        "notes": None,
+        "bmi": 22.04,
+        "bmr": 1290.0,
+        "tdee": 1548.0,
+    }
+
+@pytest.fixture
+def database(tmp_path):
+    db.init_db(str(tmp_path / "app.db"))
+    return tmp_path
+
+
+def test_insert_and_fetch_user(database):
+    assert db.insert_user(make_user())
+    row = db.fetch_user("u1")
+    assert dict(row) == {k: v for k, v in make_user().items() if k != "created_at"}
+    assert db.fetch_user("missing") is None
+
+def test_duplicate_user_is_rejected(database):
+    assert db.insert_user(make_user())
+    assert not db.insert_user(make_user(name="Other"))
+    assert db.fetch_user("u1")["name"] == "Test"
+
+def test_snapshots_ordered_by_timestamp_then_insertion(database):
+    db.insert_user(make_user())
+    db.insert_snapshot("c", make_snapshot(timestamp="2025-01-02T00:00:00", weight_kg=3))
+    db.insert_snapshot("b", make_snapshot(timestamp="2025-01-01T00:00:00", weight_kg=1))
+    db.insert_snapshot("a", make_snapshot(timestamp="2025-01-01T00:00:00", weight_kg=2))
+    db.insert_snapshot("z", make_snapshot(user_id="other"))
+    rows = db.fetch_snapshots("u1")
+    assert [r["id"] for r in rows] == ["b", "a", "c"]
+    assert dict(rows[0]) == {"id": "b", **make_snapshot(weight_kg=1)}
+
+
+def write_legacy(tmp_path, users, snaps_jsonl=None, snaps_dict=None):
+    paths = (tmp_path / "users.json", tmp_path / "snapshots.jsonl", tmp_path / "snapshots.json")
+    paths[0].write_text(users)
+    if snaps_jsonl is not None:
+        paths[1].write_text("".join(json.dumps(s) + "\n" for s in snaps_jsonl))
+    if snaps_dict is not None:
+        paths[2].write_text(json.dumps(snaps_dict))
+    return [str(p) for p in paths]
+
+def test_import_jsonl(database):
+    paths = write_legacy(database, json.dumps({"u1": make_user()}),
+                         snaps_jsonl=[{"id": "s1", **make_snapshot()}])
+    db.import_json(*paths)
+    assert db.fetch_user("u1") is not None
+    assert [r["id"] for r in db.fetch_snapshots("u1")] == ["s1"]
+
+def test_import_runs_only_once(database):
+    paths = write_legacy(database, json.dumps({"u1": make_user()}))
+    db.import_json(*paths)
+    write_legacy(database, json.dumps({"u2": make_user("u2")}))
+    db.import_json(*paths)
+    assert db.fetch_user("u2") is None
+
+def test_import_legacy_snapshots_json(database):
+    paths = write_legacy(database, json.dumps({"u1": make_user()}),
+                         snaps_dict={"s1": make_snapshot()})
+    db.import_json(*paths)
+    assert [r["id"] for r in db.fetch_snapshots("u1")] == ["s1"]
+
+def test_failed_import_is_retried(database):
+    paths = write_legacy(database, "{not json")
+    with pytest.raises(ValueError):
+        db.import_json(*paths)
+    assert db.connect().execute("PRAGMA user_version").fetchone()[0] == 0
+    write_legacy(database, json.dumps({"u1": make_user()}))
+    db.import_json(*paths)
+    assert db.fetch_user("u1") is not None
@@ -0,0 +1,29 @@
+import importlib, os
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+
+@pytest.fixture(scope="module")
+def compute_metrics(tmp_path_factory):
+    # app.py creates data/app.db relative to the cwd on import
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("backend"))
+    try:
+        app = importlib.import_module("app")
+    finally:
+        os.chdir(cwd)
+    return app.compute_metrics
+
+
+# expected values match the original calculate_bmi/calculate_bmr/calculate_tdee
+@pytest.mark.parametrize("weight, height, age, sex, activity, expected", [
+    (70, 175, 30, "male", "moderate", (22.86, 1649.0, 2556.0)),
+    (90, 180, 25, "Male", "couch", (27.78, 1905.0, 2286.0)),
+    (60, 165, 35, "female", "light", (22.04, 1295.0, 1781.0)),
+    (80, 180, 40, "other", "very_active", (24.69, 1564.0, 2972.0)),
+    (50, 0, 20, "female", "sedentary", (None, 239.0, 287.0)),
+])
+def test_compute_metrics(compute_metrics, weight, height, age, sex, activity, expected):
+    assert compute_metrics(weight, height, age, sex, activity) == expected